@@ -12,19 +12,41 @@ Analyze labeled IMU logs WITHOUT pandas:
 Input expected header (CSV-like .txt):
 t,ax,ay,az,gx,gy,gz,a_mag,w_mag,label,event_id,label_change
 (If a_mag/w_mag are missing, they will be computed.)
+Logs written with the logger's --compress gz / zstd (.txt.gz / .txt.zst) are read directly.
+
+Pure standard library, so it also runs unchanged under PyPy
+(`pypy3 analyze_fall_no_pandas.py ...`); the window loop is written as plain
+scalar code with locals so the JIT can compile it.
 
 Run:
   python3 -u analyze_fall_no_pandas.py --in data/datos_imu.txt \
     --out-json fall_fuzzy_params.json --out-report fall_report.txt \
     --win 1.0 --hop 0.5
+
+Several logs at once (processed in parallel, outputs suffixed per input):
+  python3 -u analyze_fall_no_pandas.py --in 'data/*.txt' --jobs 4
 """
 
 import argparse
 import csv
+import glob
+import gzip
+import io
 import json
 import math
+import operator
 import os
-from typing import List, Dict, Tuple, Any
+import statistics
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress, count, islice
+from typing import List, Dict, Tuple, Any, Iterable, Iterator
+
+try:
+    import zstandard  # optional: .zst logs from the logger's --compress zstd
+except ImportError:
+    zstandard = None
 
 # ---------- Small utilities (no numpy, no pandas) ----------
 
@@ -34,14 +56,11 @@ def safe_float(x: str, default: float = float("nan")) -> float:
     except Exception:
         return default
 
-def percentile(values: List[float], p: float) -> float:
+def percentile_sorted(vs: List[float], p: float) -> float:
     """
-    Simple percentile (0..100) with linear interpolation between closest ranks.
-    values must be a non-empty list of floats.
+    Percentile (0..100) with linear interpolation between closest ranks.
+    vs must be a non-empty list of floats, already sorted and NaN-free.
     """
-    vs = sorted(v for v in values if not math.isnan(v))
-    if not vs:
-        return float("nan")
     if p <= 0: return vs[0]
     if p >= 100: return vs[-1]
     k = (len(vs)-1) * (p/100.0)
@@ -51,13 +70,98 @@ def percentile(values: List[float], p: float) -> float:
     d1 = vs[c] * (k-f)
     return d0 + d1
 
+def percentile(values: List[float], p: float) -> float:
+    """
+    Simple percentile (0..100) with linear interpolation between closest ranks.
+    values must be a non-empty list of floats.
+    """
+    vs = sorted(v for v in values if not math.isnan(v))
+    if not vs:
+        return float("nan")
+    return percentile_sorted(vs, p)
+
+class P2Quantile:
+    """
+    Streaming estimate of one percentile (0..100) with the P² algorithm
+    (Jain & Chlamtac, 1985): five markers, O(1) memory and time per update.
+    The first EXACT_N values are kept as-is and answered exactly (same as
+    percentile()): with only a handful of values the P² markers cannot move
+    yet and every percentile would collapse onto a few samples. Past EXACT_N the
+    markers are seeded from the sorted buffer and the buffer is dropped.
+    """
+    EXACT_N = 500
+
+    def __init__(self, p: float):
+        self.p = p
+        self.exact: List[float] = []   # values seen so far, until P² takes over
+        self.q: List[float] = []       # marker heights
+        self.n: List[int] = []         # marker positions (0-based ranks)
+        f = p / 100.0
+        self.step = [0.0, f/2, f, (1 + f)/2, 1.0]      # desired position increments
+        self.want: List[float] = []                    # desired positions
+
+    def _seed(self):
+        """Markers at their desired ranks in the sorted buffer (exact start state)."""
+        vs = sorted(self.exact)
+        last = len(vs) - 1
+        self.want = [last * s for s in self.step]
+        n = [int(round(w)) for w in self.want]
+        for i in (1, 2, 3):   # ranks must stay strictly increasing for the updates
+            n[i] = min(max(n[i], n[i-1] + 1), last - (4 - i))
+        self.n = n
+        self.q = [vs[i] for i in n]
+        self.exact = []
+
+    def update(self, x: float):
+        if not self.q:
+            self.exact.append(x)
+            if len(self.exact) > self.EXACT_N:
+                self._seed()
+            return
+        q, n = self.q, self.n
+
+        # Cell k such that q[k] <= x < q[k+1]; extremes stretch the end markers
+        if x < q[0]:
+            q[0] = x; k = 0
+        elif x >= q[4]:
+            q[4] = x; k = 3
+        else:
+            k = 0
+            while x >= q[k+1]:
+                k += 1
+        for i in range(k+1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.want[i] += self.step[i]
+
+        # Move the three middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = self.want[i] - n[i]
+            if (d >= 1 and n[i+1] - n[i] > 1) or (d <= -1 and n[i-1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                # Piecewise-parabolic prediction; fall back to linear if it overshoots
+                qp = q[i] + d / (n[i+1] - n[i-1]) * (
+                    (n[i] - n[i-1] + d) * (q[i+1] - q[i]) / (n[i+1] - n[i]) +
+                    (n[i+1] - n[i] - d) * (q[i] - q[i-1]) / (n[i] - n[i-1]))
+                if not q[i-1] < qp < q[i+1]:
+                    qp = q[i] + d * (q[i+d] - q[i]) / (n[i+d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    def estimate(self) -> float:
+        if self.q:
+            return self.q[2]
+        if not self.exact:
+            return float("nan")
+        return percentile_sorted(sorted(self.exact), self.p)
+
 def tilt_deg(ax: float, ay: float, az: float) -> float:
     """
     Trunk tilt relative to gravity axis. 0 deg = upright, ~90 deg = horizontal.
     Uses only accelerometer. Clamped to [0,180].
     """
-    horiz = math.sqrt(ax*ax + ay*ay)
-    ang = math.degrees(math.atan2(horiz, abs(az) + 1e-9))
+    # atan2 is defined for az == 0 (gives 90 deg), so no epsilon guard is needed
+    ang = math.degrees(math.atan2(math.hypot(ax, ay), abs(az)))
     return max(0.0, min(180.0, ang))
 
 def slice_windows(n: int, win_n: int, hop_n: int):
@@ -69,119 +173,199 @@ def slice_windows(n: int, win_n: int, hop_n: int):
 
 # ---------- Core analysis ----------
 
-def load_labeled_rows(path: str) -> Dict[str, List[Any]]:
+NUMERIC_COLS = ["t","ax","ay","az","gx","gy","gz"]
+REQUIRED_COLS = NUMERIC_COLS + ["label"]
+FEATURE_KEYS = ["ax_pk","ay_pk","az_pk","gx_pk","gy_pk","gz_pk",
+                "impact_g","omega_peak","tilt_delta"]
+WINDOW_COLS = ["t_start", "t_end"] + FEATURE_KEYS
+STAT_PCTS = [10, 25, 50, 75, 90]
+
+def open_text_log(path: str):
+    """Text reader for path, decompressing .gz / .zst (logger --compress) by extension."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise SystemExit("Reading .zst logs needs the 'zstandard' package (pip install zstandard).")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(io.BufferedReader(raw), newline="")
+    return open(path, "r", newline="")
+
+def load_labeled_rows(path: str) -> Dict[str, Any]:
     """
     Load CSV-like file and return dict of columns. Detect column indices by header names.
+    Only the columns used by the analysis are kept: t, ax..gz are parsed to float
+    while reading (single pass over the text) into compact array('d') columns,
+    and label stays as a list of strings.
     """
-    with open(path, "r") as f:
+    with open_text_log(path) as f:
         reader = csv.reader(f)
         header = next(reader)
         name_to_idx = {name.strip(): idx for idx, name in enumerate(header)}
 
-        required = ["t","ax","ay","az","gx","gy","gz","label"]
-        for r in required:
+        for r in REQUIRED_COLS:
             if r not in name_to_idx:
                 raise RuntimeError(f"Missing required column '{r}' in {path}")
 
-        cols = {name: [] for name in header}
-        for row in reader:
-            if not row or len(row) < len(header):
-                continue
-            for name, idx in name_to_idx.items():
-                cols[name].append(row[idx])
+        cols = {name: array("d") for name in NUMERIC_COLS}
+        cols["label"] = []
+        # Bind append methods once; the row loop then does no dict/attr lookups
+        numeric = [(name_to_idx[name], cols[name].append) for name in NUMERIC_COLS]
+        label_idx, label_append = name_to_idx["label"], cols["label"].append
+        ncols = len(header)
+        try:
+            for row in reader:
+                if len(row) < ncols:
+                    continue
+                for idx, append in numeric:
+                    append(safe_float(row[idx]))
+                label_append(row[label_idx])
+        except EOFError:
+            # .gz cut short (capture killed before the trailer): keep the rows read so far
+            pass
     return cols
 
 def compute_sampling(dt_list: List[float], default_fs: float = 50.0) -> float:
     """Estimate sampling rate from dt median; fallback to default_fs."""
-    dts = [dt_list[i+1]-dt_list[i] for i in range(len(dt_list)-1)]
-    dts = [d for d in dts if d > 0]
+    # Consecutive differences via C-level map/islice (no index arithmetic per sample)
+    dts = [d for d in map(operator.sub, islice(dt_list, 1, None), dt_list) if d > 0]
     if not dts:
         return default_fs
-    dts_sorted = sorted(dts)
-    mid = len(dts_sorted)//2
-    dt_med = dts_sorted[mid] if len(dts_sorted)%2==1 else 0.5*(dts_sorted[mid-1]+dts_sorted[mid])
+    dt_med = statistics.median(dts)
     return 1.0 / dt_med if dt_med > 0 else default_fs
 
-def window_features_fall(cols: Dict[str, List[Any]], win_s: float, hop_s: float) -> List[Dict[str, float]]:
+def iter_window_features_fall(cols: Dict[str, Any], win_s: float, hop_s: float) -> Iterator[Tuple[float, ...]]:
     """
-    Compute features over windows restricted to rows labeled FALL:
+    Compute features over windows restricted to rows labeled FALL.
+    Yields one tuple per window, in WINDOW_COLS order:
+      - t_start, t_end = window time span
       - per-axis peak abs: ax_pk, ay_pk, az_pk, gx_pk, gy_pk, gz_pk
       - impact_g = max(|a|) in window
       - omega_peak = max(|ω|) in window
       - tilt_delta = tilt_end - tilt_start (deg)
     """
-    # Parse base columns
-    t = [safe_float(x) for x in cols["t"]]
-    ax = [safe_float(x) for x in cols["ax"]]
-    ay = [safe_float(x) for x in cols["ay"]]
-    az = [safe_float(x) for x in cols["az"]]
-    gx = [safe_float(x) for x in cols["gx"]]
-    gy = [safe_float(x) for x in cols["gy"]]
-    gz = [safe_float(x) for x in cols["gz"]]
-    label = [str(x).strip().upper() for x in cols["label"]]
-
-    n = min(len(t), len(ax), len(ay), len(az), len(gx), len(gy), len(gz), len(label))
-    t = t[:n]; ax = ax[:n]; ay = ay[:n]; az = az[:n]; gx = gx[:n]; gy = gy[:n]; gz = gz[:n]; label = label[:n]
-
-    # Keep only FALL rows
-    idx_fall = [i for i in range(n) if label[i] == "FALL"]
+    # Base columns (already parsed and aligned by load_labeled_rows)
+    t = cols["t"]
+    ax = cols["ax"]; ay = cols["ay"]; az = cols["az"]
+    gx = cols["gx"]; gy = cols["gy"]; gz = cols["gz"]
+
+    # Keep only FALL rows. Labels come from csv as str, so normalization and the
+    # comparison run as chained C-level map()/compress() with no per-row bytecode.
+    is_fall = map("FALL".__eq__, map(str.upper, map(str.strip, cols["label"])))
+    idx_fall = list(compress(count(), is_fall))
     if not idx_fall:
         raise RuntimeError("No FALL rows found. Check your labels.")
 
     # Build compact arrays for FALL segment(s)
-    t_f = [t[i] for i in idx_fall]
-    ax_f = [ax[i] for i in idx_fall]
-    ay_f = [ay[i] for i in idx_fall]
-    az_f = [az[i] for i in idx_fall]
-    gx_f = [gx[i] for i in idx_fall]
-    gy_f = [gy[i] for i in idx_fall]
-    gz_f = [gz[i] for i in idx_fall]
+    t_f = array("d", map(t.__getitem__, idx_fall))
+    ax_f = array("d", map(ax.__getitem__, idx_fall))
+    ay_f = array("d", map(ay.__getitem__, idx_fall))
+    az_f = array("d", map(az.__getitem__, idx_fall))
+    gx_f = array("d", map(gx.__getitem__, idx_fall))
+    gy_f = array("d", map(gy.__getitem__, idx_fall))
+    gz_f = array("d", map(gz.__getitem__, idx_fall))
 
     # Estimate sampling rate on FALL only
     fs = compute_sampling(t_f, default_fs=50.0)
     win_n = max(1, int(round(win_s * fs)))
     hop_n = max(1, int(round(hop_s * fs)))
 
-    feats = []
+    _sqrt = math.sqrt
     for i0, i1 in slice_windows(len(t_f), win_n, hop_n):
-        # Per-axis peaks (absolute)
-        ax_pk = max(abs(v) for v in ax_f[i0:i1])
-        ay_pk = max(abs(v) for v in ay_f[i0:i1])
-        az_pk = max(abs(v) for v in az_f[i0:i1])
-        gx_pk = max(abs(v) for v in gx_f[i0:i1])
-        gy_pk = max(abs(v) for v in gy_f[i0:i1])
-        gz_pk = max(abs(v) for v in gz_f[i0:i1])
-
-        # Magnitude peaks
-        impact_g = max(math.sqrt(ax_f[k]**2 + ay_f[k]**2 + az_f[k]**2) for k in range(i0, i1))
-        omega_pk = max(math.sqrt(gx_f[k]**2 + gy_f[k]**2 + gz_f[k]**2) for k in range(i0, i1))
+        # One scalar pass over the window (no slices, no generators): running
+        # per-axis |peak| and squared magnitude peaks; sqrt once at the end.
+        mx_ax = mx_ay = mx_az = mx_gx = mx_gy = mx_gz = 0.0
+        mx_a2 = mx_w2 = 0.0
+        for k in range(i0, i1):
+            x = ax_f[k]; y = ay_f[k]; z = az_f[k]
+            v = x if x >= 0.0 else -x
+            if v > mx_ax: mx_ax = v
+            v = y if y >= 0.0 else -y
+            if v > mx_ay: mx_ay = v
+            v = z if z >= 0.0 else -z
+            if v > mx_az: mx_az = v
+            v = x*x + y*y + z*z
+            if v > mx_a2: mx_a2 = v
+
+            x = gx_f[k]; y = gy_f[k]; z = gz_f[k]
+            v = x if x >= 0.0 else -x
+            if v > mx_gx: mx_gx = v
+            v = y if y >= 0.0 else -y
+            if v > mx_gy: mx_gy = v
+            v = z if z >= 0.0 else -z
+            if v > mx_gz: mx_gz = v
+            v = x*x + y*y + z*z
+            if v > mx_w2: mx_w2 = v
 
         # Tilt delta
         tilt_start = tilt_deg(ax_f[i0], ay_f[i0], az_f[i0])
         tilt_end   = tilt_deg(ax_f[i1-1], ay_f[i1-1], az_f[i1-1])
-        tilt_delta = tilt_end - tilt_start
-
-        feats.append({
-            "t_start": t_f[i0],
-            "t_end": t_f[i1-1],
-            "ax_pk": ax_pk, "ay_pk": ay_pk, "az_pk": az_pk,
-            "gx_pk": gx_pk, "gy_pk": gy_pk, "gz_pk": gz_pk,
-            "impact_g": impact_g, "omega_peak": omega_pk,
-            "tilt_delta": tilt_delta
-        })
+
+        yield (t_f[i0], t_f[i1-1],
+               mx_ax, mx_ay, mx_az, mx_gx, mx_gy, mx_gz,
+               _sqrt(mx_a2), _sqrt(mx_w2),
+               tilt_end - tilt_start)
+
+def window_features_fall(cols: Dict[str, Any], win_s: float, hop_s: float) -> Dict[str, array]:
+    """
+    Materialize iter_window_features_fall as one column per WINDOW_COLS name
+    (array of doubles, one entry per window).
+    """
+    feats = {k: array("d") for k in WINDOW_COLS}
+    appends = [feats[k].append for k in WINDOW_COLS]
+    for row in iter_window_features_fall(cols, win_s, hop_s):
+        for append, v in zip(appends, row):
+            append(v)
     return feats
 
 def summarize_percentiles(values: List[float], name: str) -> Dict[str, float]:
-    clean = [v for v in values if not math.isnan(v)]
+    # Sort once and read every percentile from the same sorted list
+    clean = sorted(v for v in values if not math.isnan(v))
     if not clean:
         return {"p10": float("nan"), "p25": float("nan"), "p50": float("nan"),
                 "p75": float("nan"), "p90": float("nan"), "min": float("nan"), "max": float("nan")}
     return {
-        "min": min(clean), "max": max(clean),
-        "p10": percentile(clean, 10), "p25": percentile(clean, 25),
-        "p50": percentile(clean, 50), "p75": percentile(clean, 75), "p90": percentile(clean, 90)
+        "min": clean[0], "max": clean[-1],
+        "p10": percentile_sorted(clean, 10), "p25": percentile_sorted(clean, 25),
+        "p50": percentile_sorted(clean, 50), "p75": percentile_sorted(clean, 75),
+        "p90": percentile_sorted(clean, 90)
     }
 
+def summarize_percentiles_stream(windows: Iterable[Tuple[float, ...]]) -> Tuple[Dict[str, Dict[str, float]], int]:
+    """
+    Single-pass version of summarize_percentiles for every feature in FEATURE_KEYS.
+    Consumes window tuples (WINDOW_COLS order) without storing them: min/max are
+    exact, p10..p90 are exact up to P2Quantile.EXACT_N windows and P² estimates
+    beyond. Returns (stats per feature, window count).
+    """
+    pos = [WINDOW_COLS.index(k) for k in FEATURE_KEYS]
+    est = [[P2Quantile(p) for p in STAT_PCTS] for _ in FEATURE_KEYS]
+    lo = [math.inf] * len(FEATURE_KEYS)
+    hi = [-math.inf] * len(FEATURE_KEYS)
+    n = 0
+    for row in windows:
+        n += 1
+        for j, i in enumerate(pos):
+            v = row[i]
+            if math.isnan(v):
+                continue
+            if v < lo[j]: lo[j] = v
+            if v > hi[j]: hi[j] = v
+            for q in est[j]:
+                q.update(v)
+
+    stats = {}
+    for j, key in enumerate(FEATURE_KEYS):
+        if lo[j] > hi[j]:
+            stats[key] = summarize_percentiles([], key)
+            continue
+        st = {"min": lo[j], "max": hi[j]}
+        # Independent estimators can cross by a little; keep p10 <= ... <= p90
+        for p, v in zip(STAT_PCTS, sorted(q.estimate() for q in est[j])):
+            st[f"p{p}"] = v
+        stats[key] = st
+    return stats, n
+
 def trimf_from_quartiles(stats: Dict[str, float], lo_bound: float, hi_bound: float) -> Dict[str, List[float]]:
     """
     Build 3 triangular sets from FALL quartiles:
@@ -206,8 +390,8 @@ def trimf_from_quartiles(stats: Dict[str, float], lo_bound: float, hi_bound: flo
     hig = tri(p50, p75, mx)
     return {"low": low, "medium": med, "high": hig}
 
-def build_fuzzy_from_fall(feats: List[Dict[str, float]],
-                          max_g: float, max_dps: float) -> Dict[str, Any]:
+def fuzzy_params_from_stats(stats: Dict[str, Dict[str, float]],
+                            max_g: float, max_dps: float) -> Dict[str, Any]:
     """
     Using FALL-only distribution to propose 3-range memberships for:
       - per-axis peaks (ax, ay, az, gx, gy, gz)
@@ -219,41 +403,32 @@ def build_fuzzy_from_fall(feats: List[Dict[str, float]],
       omega_peak → [0, max_dps]
       tilt_delta → [0, 120]
     """
-    # collect lists
-    get = lambda k: [w[k] for w in feats]
+    # Universe upper bound per feature (lower bound is always 0)
+    hi_bounds = {
+        "ax_pk": max_g, "ay_pk": max_g, "az_pk": max_g,
+        "gx_pk": max_dps, "gy_pk": max_dps, "gz_pk": max_dps,
+        "impact_g": max_g, "omega_peak": max_dps, "tilt_delta": 120.0,
+    }
 
-    stats = {}
-    for key in ["ax_pk","ay_pk","az_pk","gx_pk","gy_pk","gz_pk",
-                "impact_g","omega_peak","tilt_delta"]:
-        stats[key] = summarize_percentiles(get(key), key)
-
-    params = {
-        "universes": {
-            "ax_pk": [0.0, max_g], "ay_pk": [0.0, max_g], "az_pk": [0.0, max_g],
-            "gx_pk": [0.0, max_dps], "gy_pk": [0.0, max_dps], "gz_pk": [0.0, max_dps],
-            "impact_g": [0.0, max_g], "omega_peak": [0.0, max_dps], "tilt_delta": [0.0, 120.0],
-        },
-        "trimf": {},
+    # Universes and trimfs from quartiles, one pass over the feature table
+    return {
+        "universes": {k: [0.0, hi] for k, hi in hi_bounds.items()},
+        "trimf": {k: trimf_from_quartiles(stats[k], 0.0, hi) for k, hi in hi_bounds.items()},
         "percentiles": stats
     }
 
-    # Build trimfs from quartiles per feature
-    params["trimf"]["ax_pk"]      = trimf_from_quartiles(stats["ax_pk"], 0.0, max_g)
-    params["trimf"]["ay_pk"]      = trimf_from_quartiles(stats["ay_pk"], 0.0, max_g)
-    params["trimf"]["az_pk"]      = trimf_from_quartiles(stats["az_pk"], 0.0, max_g)
-    params["trimf"]["gx_pk"]      = trimf_from_quartiles(stats["gx_pk"], 0.0, max_dps)
-    params["trimf"]["gy_pk"]      = trimf_from_quartiles(stats["gy_pk"], 0.0, max_dps)
-    params["trimf"]["gz_pk"]      = trimf_from_quartiles(stats["gz_pk"], 0.0, max_dps)
-    params["trimf"]["impact_g"]   = trimf_from_quartiles(stats["impact_g"], 0.0, max_g)
-    params["trimf"]["omega_peak"] = trimf_from_quartiles(stats["omega_peak"], 0.0, max_dps)
-    params["trimf"]["tilt_delta"] = trimf_from_quartiles(stats["tilt_delta"], 0.0, 120.0)
-
-    return params
+def build_fuzzy_from_fall(feats: Dict[str, array],
+                          max_g: float, max_dps: float) -> Dict[str, Any]:
+    """Exact percentiles over materialized window features, then fuzzy_params_from_stats."""
+    stats = {}
+    for key in FEATURE_KEYS:
+        stats[key] = summarize_percentiles(feats[key], key)
+    return fuzzy_params_from_stats(stats, max_g, max_dps)
 
-def write_report(report_path: str, fs: float, feats: List[Dict[str, float]], params: Dict[str, Any]):
+def write_report(report_path: str, fs: float, n_windows: int, params: Dict[str, Any]):
     with open(report_path, "w") as f:
         f.write("# FALL analysis report (no pandas)\n")
-        f.write(f"Windows: {len(feats)} | Sampling ~ {fs:.2f} Hz\n\n")
+        f.write(f"Windows: {n_windows} | Sampling ~ {fs:.2f} Hz\n\n")
         f.write("Features per window: ax_pk, ay_pk, az_pk, gx_pk, gy_pk, gz_pk, impact_g, omega_peak, tilt_delta\n\n")
         f.write("## Percentiles (FALL only)\n")
         for k, st in params["percentiles"].items():
@@ -268,37 +443,119 @@ def write_report(report_path: str, fs: float, feats: List[Dict[str, float]], par
         f.write("- These ranges come from FALL quartiles only. Later merge with ADL to adjust universes/overlaps.\n")
         f.write("- Consider using impact_g + omega_peak + tilt_delta for a compact fuzzy model.\n")
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--in", dest="infile", required=True, help="Input labeled .txt/.csv")
-    ap.add_argument("--out-json", dest="out_json", default="fall_fuzzy_params.json", help="Output JSON with trimf")
-    ap.add_argument("--out-report", dest="out_report", default="fall_report.txt", help="Text report")
-    ap.add_argument("--win", type=float, default=1.0, help="Window size (s)")
-    ap.add_argument("--hop", type=float, default=0.5, help="Hop size (s)")
-    ap.add_argument("--max-g", type=float, default=3.0, help="Accel universe upper bound (g)")
-    ap.add_argument("--max-dps", type=float, default=400.0, help="Gyro universe upper bound (deg/s)")
-    args = ap.parse_args()
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """Expand shell-style globs (kept literal when nothing matches, so open() reports it)."""
+    paths = []
+    for pat in patterns:
+        paths.extend(sorted(glob.glob(pat)) or [pat])
+    return paths
 
-    cols = load_labeled_rows(args.infile)
+def input_stems(paths: List[str]) -> List[str]:
+    """
+    Output suffix per input: logs/walk_01.txt(.gz) -> walk_01. Stems that repeat get their
+    parent directory in front (s1/walk.txt, s2/walk.txt -> s1_walk, s2_walk); anything still
+    equal gets an index, so no two inputs ever share an output file.
+    """
+    stems = []
+    for path in paths:
+        name = os.path.basename(path)
+        for cext in (".gz", ".zst"):
+            if name.endswith(cext):
+                name = name[:-len(cext)]
+        stems.append(os.path.splitext(name)[0])
+    stems = [f"{os.path.basename(os.path.dirname(os.path.abspath(p)))}_{s}" if stems.count(s) > 1 else s
+             for p, s in zip(paths, stems)]
+    seen: Dict[str, int] = {}
+    unique = []
+    for s in stems:
+        if stems.count(s) > 1:
+            seen[s] = seen.get(s, 0) + 1
+            s = f"{s}_{seen[s]}"
+        unique.append(s)
+    return unique
+
+def per_input_path(out_path: str, stem: str) -> str:
+    """out.json + walk_01 -> out_walk_01.json (used when several inputs are given)."""
+    root, ext = os.path.splitext(out_path)
+    return f"{root}_{stem}{ext}"
+
+def process_file(infile: str, out_json: str, out_report: str, args: argparse.Namespace) -> Tuple[int, float]:
+    """Full analysis of one log; returns (FALL windows, sampling rate)."""
+    cols = load_labeled_rows(infile)
 
     # Rough sampling from entire file for reporting
-    t_all = [safe_float(x) for x in cols["t"]]
-    fs_report = compute_sampling(t_all, default_fs=50.0)
+    fs_report = compute_sampling(cols["t"], default_fs=50.0)
 
-    feats = window_features_fall(cols, win_s=args.win, hop_s=args.hop)
-    params = build_fuzzy_from_fall(feats, max_g=args.max_g, max_dps=args.max_dps)
+    if args.stream:
+        windows = iter_window_features_fall(cols, win_s=args.win, hop_s=args.hop)
+        stats, n_windows = summarize_percentiles_stream(windows)
+        params = fuzzy_params_from_stats(stats, max_g=args.max_g, max_dps=args.max_dps)
+    else:
+        feats = window_features_fall(cols, win_s=args.win, hop_s=args.hop)
+        n_windows = len(feats["t_start"])
+        params = build_fuzzy_from_fall(feats, max_g=args.max_g, max_dps=args.max_dps)
 
     # Save JSON
-    with open(args.out_json, "w") as jf:
+    with open(out_json, "w") as jf:
         json.dump(params, jf, indent=2)
     # Save text report
-    write_report(args.out_report, fs_report, feats, params)
+    write_report(out_report, fs_report, n_windows, params)
+    return n_windows, fs_report
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="infile", nargs="+", required=True,
+                    help="Input labeled .txt/.csv, optionally .gz/.zst (several files or globs allowed)")
+    ap.add_argument("--out-json", dest="out_json", default="fall_fuzzy_params.json",
+                    help="Output JSON with trimf (suffixed with the input name when several inputs)")
+    ap.add_argument("--out-report", dest="out_report", default="fall_report.txt",
+                    help="Text report (suffixed with the input name when several inputs)")
+    ap.add_argument("--win", type=float, default=1.0, help="Window size (s)")
+    ap.add_argument("--hop", type=float, default=0.5, help="Hop size (s)")
+    ap.add_argument("--max-g", type=float, default=3.0, help="Accel universe upper bound (g)")
+    ap.add_argument("--max-dps", type=float, default=400.0, help="Gyro universe upper bound (deg/s)")
+    ap.add_argument("--stream", action="store_true",
+                    help="Estimate percentiles on the fly (P², constant memory) instead of storing every window")
+    ap.add_argument("--jobs", type=int, default=0, help="Worker processes for several inputs (0 = all CPUs)")
+    args = ap.parse_args()
+
+    paths = expand_inputs(args.infile)
+    if len(paths) == 1:
+        outs = [(args.out_json, args.out_report)]
+    else:
+        outs = [(per_input_path(args.out_json, s), per_input_path(args.out_report, s))
+                for s in input_stems(paths)]
+
+    # Files are independent: one process per file when there are several.
+    # A failing file is reported and skipped; the others still finish.
+    failed = []
+    if len(paths) == 1:
+        results = [process_file(paths[0], outs[0][0], outs[0][1], args)]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs or None) as pool:
+            futures = [pool.submit(process_file, p, oj, orp, args) for p, (oj, orp) in zip(paths, outs)]
+            results = []
+            for path, fut in zip(paths, futures):
+                try:
+                    results.append(fut.result())
+                except Exception as e:
+                    results.append(None)
+                    failed.append(path)
+                    print(f"[ERROR] {path}: {e}", file=sys.stderr)
 
     # Console summary
-    print(f"[OK] Windows (FALL): {len(feats)} | fs≈{fs_report:.2f} Hz")
-    print(f"[OK] JSON saved -> {os.path.abspath(args.out_json)}")
-    print(f"[OK] Report saved -> {os.path.abspath(args.out_report)}")
+    for path, (out_json, out_report), result in zip(paths, outs, results):
+        if result is None:
+            continue
+        n_windows, fs_report = result
+        if len(paths) > 1:
+            print(f"== {path}")
+        print(f"[OK] Windows (FALL): {n_windows} | fs≈{fs_report:.2f} Hz")
+        print(f"[OK] JSON saved -> {os.path.abspath(out_json)}")
+        print(f"[OK] Report saved -> {os.path.abspath(out_report)}")
     print("\nUse these 'trimf' arrays to set fuzz.trimf(universe, [a,b,c]) for each feature.")
     print("Next step: run the SAME script later for ADL to compare ranges or compute mixed thresholds.")
+    if failed:
+        sys.exit(f"[ERROR] {len(failed)} of {len(paths)} inputs failed: {', '.join(failed)}")
 if __name__ == "__main__":
     main()
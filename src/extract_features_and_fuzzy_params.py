@@ -21,13 +21,48 @@ Threshold heuristic:
 """
 
 import argparse
+import glob
 import json
 import math
 import os
-from typing import Dict, Tuple
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import orjson  # optional: faster JSON writer with native numpy scalar support
+except ImportError:
+    orjson = None
+
+
+def nan_to_none(obj):
+    """Recursively replace NaN floats with None so they serialize as JSON null."""
+    if isinstance(obj, dict):
+        return {k: nan_to_none(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [nan_to_none(v) for v in obj]
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    return obj
+
+
+def dump_json(obj, path: str) -> None:
+    """
+    Write obj as 2-space indented JSON. Uses orjson when installed, else the
+    stdlib json module (numpy float64 values are float subclasses, so both work).
+    NaN is written as null by both writers, so the file does not depend on which one ran.
+    """
+    obj = nan_to_none(obj)
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, "w") as f:
+            json.dump(obj, f, indent=2, allow_nan=False)
 
 
 def tilt_deg(ax: np.ndarray, ay: np.ndarray, az: np.ndarray) -> np.ndarray:
@@ -35,11 +70,31 @@ def tilt_deg(ax: np.ndarray, ay: np.ndarray, az: np.ndarray) -> np.ndarray:
     Trunk tilt relative to gravity axis. 0 deg = upright, ~90 deg = horizontal.
     Robust and cheap using only accelerometer.
     """
-    horiz = np.sqrt(ax * ax + ay * ay)
-    ang = np.degrees(np.arctan2(horiz, np.abs(az) + 1e-9))
+    # arctan2 handles az == 0 (gives 90 deg), so no epsilon guard is needed
+    horiz = np.hypot(ax, ay)
+    ang = np.degrees(np.arctan2(horiz, np.abs(az)))
     return np.clip(ang, 0, 180)
 
 
+INPUT_COLS = ["t", "ax", "ay", "az", "gx", "gy", "gz", "label"]
+
+
+def load_labeled_log(path: str) -> pd.DataFrame:
+    """
+    Read only the columns used for features (t, ax..gz, label) with the C parser
+    over a memory-mapped file; a_mag/w_mag/event_id/label_change are never parsed.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    # Basic sanity: ensure label col exists
+    if "label" not in header:
+        raise RuntimeError("Input file has no 'label' column. Did you use the labeled logger?")
+    missing = [c for c in INPUT_COLS if c not in header]
+    if missing:
+        raise RuntimeError(f"Input file is missing columns: {', '.join(missing)}")
+    return pd.read_csv(path, usecols=INPUT_COLS, dtype={"label": str},
+                       memory_map=True, engine="c")
+
+
 def compute_window_features(df: pd.DataFrame, win_s: float, hop_s: float) -> pd.DataFrame:
     """
     Slice the stream into windows and compute features:
@@ -75,37 +130,45 @@ def compute_window_features(df: pd.DataFrame, win_s: float, hop_s: float) -> pd.
     w_mag = np.sqrt(gx * gx + gy * gy + gz * gz)
     tilt = tilt_deg(ax, ay, az)
 
-    rows = []
-    i = 0
-    while i + win_n <= len(df):
-        sl = slice(i, i + win_n)
-        t0, t1 = float(t[sl.start]), float(t[sl.stop - 1])
-
-        impact_g = float(np.max(a_mag[sl]))
-        omega_peak = float(np.max(w_mag[sl]))
-        tilt_mean = float(np.mean(tilt[sl]))
-        tilt_delta = float(tilt[sl.stop - 1] - tilt[sl.start])
-
-        # Window label: majority, ignoring NONE when mixed
-        labs, counts = np.unique(labels[sl], return_counts=True)
-        if len(labs) > 1 and "NONE" in labs:
-            mask = labs != "NONE"
-            labs = labs[mask]; counts = counts[mask]
-        win_label = str(labs[np.argmax(counts)]) if len(labs) else "NONE"
-
-        rows.append({
-            "t_start": t0,
-            "t_end": t1,
-            "impact_g": impact_g,
-            "omega_peak": omega_peak,
-            "tilt_mean": tilt_mean,
-            "tilt_delta": tilt_delta,
-            "label": win_label
-        })
-
-        i += hop_n
-
-    return pd.DataFrame(rows)
+    # One strided view per signal: row k is window [k*hop_n, k*hop_n + win_n)
+    n = len(df)
+    nwin = (n - win_n) // hop_n + 1 if n >= win_n else 0
+    if nwin == 0:
+        return pd.DataFrame(columns=["t_start", "t_end", "impact_g", "omega_peak",
+                                     "tilt_mean", "tilt_delta", "label"])
+
+    def win(arr: np.ndarray) -> np.ndarray:
+        return sliding_window_view(arr, win_n)[::hop_n]
+
+    starts = np.arange(nwin) * hop_n
+    ends = starts + win_n - 1
+
+    impact_g = win(a_mag).max(axis=1)
+    omega_peak = win(w_mag).max(axis=1)
+    tilt_mean = win(tilt).mean(axis=1)
+    tilt_delta = tilt[ends] - tilt[starts]
+
+    # Window label: majority, ignoring NONE when mixed.
+    # Labels are integer-coded once (sorted like np.unique, so ties resolve the
+    # same way) and counted per window on a strided view of the codes.
+    labs, codes = np.unique(labels, return_inverse=True)
+    codes_win = win(codes)
+    counts = np.stack([(codes_win == k).sum(axis=1) for k in range(len(labs))], axis=1)
+    none_idx = np.flatnonzero(labs == "NONE")
+    if none_idx.size:
+        mixed = (counts > 0).sum(axis=1) > 1
+        counts[mixed, none_idx[0]] = 0
+    win_labels = labs[counts.argmax(axis=1)].astype(str)
+
+    return pd.DataFrame({
+        "t_start": t[starts],
+        "t_end": t[ends],
+        "impact_g": impact_g,
+        "omega_peak": omega_peak,
+        "tilt_mean": tilt_mean,
+        "tilt_delta": tilt_delta,
+        "label": win_labels
+    })
 
 
 def summarize_thresholds(feat: pd.DataFrame, feature: str) -> Dict[str, float]:
@@ -120,14 +183,14 @@ def summarize_thresholds(feat: pd.DataFrame, feature: str) -> Dict[str, float]:
             out[f"{lab}_p50"] = np.nan
             out[f"{lab}_p95"] = np.nan
         else:
-            out[f"{lab}_p50"] = float(np.nanpercentile(sub, 50))
-            out[f"{lab}_p95"] = float(np.nanpercentile(sub, 95))
+            out[f"{lab}_p50"] = np.nanpercentile(sub, 50)
+            out[f"{lab}_p95"] = np.nanpercentile(sub, 95)
 
     # Midpoint heuristic between ADL p95 and FALL p50
     adl_p95 = out.get("ADL_p95", np.nan)
     fall_p50 = out.get("FALL_p50", np.nan)
     if not np.isnan(adl_p95) and not np.isnan(fall_p50):
-        out["thr"] = float((adl_p95 + fall_p50) / 2.0)
+        out["thr"] = (adl_p95 + fall_p50) / 2.0
     else:
         out["thr"] = np.nan
     return out
@@ -238,44 +301,114 @@ def build_fuzzy_params(summary: Dict[str, Dict[str, float]],
     return params
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--in", dest="infile", required=True, help="Input labeled .txt (CSV-like)")
-    ap.add_argument("--out-features", dest="out_features", required=True, help="Output CSV for windowed features")
-    ap.add_argument("--out-json", dest="out_json", default="fuzzy_params.json", help="Output JSON for fuzzy params")
-    ap.add_argument("--win", type=float, default=1.0, help="Window size in seconds")
-    ap.add_argument("--hop", type=float, default=0.5, help="Hop size in seconds")
-    ap.add_argument("--max-g", type=float, default=3.0, help="Universe upper bound for accel (g)")
-    ap.add_argument("--max-dps", type=float, default=400.0, help="Universe upper bound for omega (deg/s)")
-    args = ap.parse_args()
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """Expand shell-style globs (kept literal when nothing matches, so the reader reports it)."""
+    paths = []
+    for pat in patterns:
+        paths.extend(sorted(glob.glob(pat)) or [pat])
+    return paths
+
 
+def input_stems(paths: List[str]) -> List[str]:
+    """
+    Output suffix per input: logs/walk_01.txt -> walk_01. Stems that repeat get their parent
+    directory in front (s1/walk.txt, s2/walk.txt -> s1_walk, s2_walk); anything still equal
+    gets an index, so no two inputs ever share an output file.
+    """
+    stems = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    stems = [f"{os.path.basename(os.path.dirname(os.path.abspath(p)))}_{s}" if stems.count(s) > 1 else s
+             for p, s in zip(paths, stems)]
+    seen: Dict[str, int] = {}
+    unique = []
+    for s in stems:
+        if stems.count(s) > 1:
+            seen[s] = seen.get(s, 0) + 1
+            s = f"{s}_{seen[s]}"
+        unique.append(s)
+    return unique
+
+
+def per_input_path(out_path: str, stem: str) -> str:
+    """feats.csv + walk_01 -> feats_walk_01.csv (used when several inputs are given)."""
+    root, ext = os.path.splitext(out_path)
+    return f"{root}_{stem}{ext}"
+
+
+def process_file(infile: str, out_features: str, out_json: str,
+                 args: argparse.Namespace) -> Tuple[int, Dict[str, Dict[str, float]]]:
+    """Features, thresholds and fuzzy params for one log; returns (feature rows, summaries)."""
     # Load
-    df = pd.read_csv(args.infile)
-    # Basic sanity: ensure label col exists
-    if "label" not in df.columns:
-        raise RuntimeError("Input file has no 'label' column. Did you use the labeled logger?")
+    df = load_labeled_log(infile)
 
     # Compute windowed features
     feat = compute_window_features(df, args.win, args.hop)
-    os.makedirs(os.path.dirname(args.out_features) or ".", exist_ok=True)
-    feat.to_csv(args.out_features, index=False)
-    print(f"[OK] Features saved -> {args.out_features}  (rows={len(feat)})")
+    os.makedirs(os.path.dirname(out_features) or ".", exist_ok=True)
+    feat.to_csv(out_features, index=False)
 
     # Summaries and thresholds
     summaries = {}
     for col in ["impact_g", "omega_peak", "tilt_delta"]:
         summaries[col] = summarize_thresholds(feat, col)
 
-    print("\n=== Summary (percentiles) ===")
-    for k, v in summaries.items():
-        print(f"{k}: ADL p50={v.get('ADL_p50'):.3f}  ADL p95={v.get('ADL_p95'):.3f}  "
-              f"FALL p50={v.get('FALL_p50'):.3f}  thr≈{v.get('thr'):.3f}")
-
     # Build fuzzy params
     fuzzy_params = build_fuzzy_params(summaries, args.max_g, args.max_dps)
-    with open(args.out_json, "w") as f:
-        json.dump(fuzzy_params, f, indent=2)
-    print(f"\n[OK] Fuzzy params saved -> {args.out_json}")
+    dump_json(fuzzy_params, out_json)
+    return len(feat), summaries
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="infile", nargs="+", required=True,
+                    help="Input labeled .txt (CSV-like); several files or globs allowed")
+    ap.add_argument("--out-features", dest="out_features", required=True,
+                    help="Output CSV for windowed features (suffixed with the input name when several inputs)")
+    ap.add_argument("--out-json", dest="out_json", default="fuzzy_params.json",
+                    help="Output JSON for fuzzy params (suffixed with the input name when several inputs)")
+    ap.add_argument("--win", type=float, default=1.0, help="Window size in seconds")
+    ap.add_argument("--hop", type=float, default=0.5, help="Hop size in seconds")
+    ap.add_argument("--max-g", type=float, default=3.0, help="Universe upper bound for accel (g)")
+    ap.add_argument("--max-dps", type=float, default=400.0, help="Universe upper bound for omega (deg/s)")
+    ap.add_argument("--jobs", type=int, default=0, help="Worker processes for several inputs (0 = all CPUs)")
+    args = ap.parse_args()
+
+    paths = expand_inputs(args.infile)
+    if len(paths) == 1:
+        outs = [(args.out_features, args.out_json)]
+    else:
+        outs = [(per_input_path(args.out_features, s), per_input_path(args.out_json, s))
+                for s in input_stems(paths)]
+
+    # Files are independent: one process per file when there are several.
+    # A failing file is reported and skipped; the others still finish.
+    failed = []
+    if len(paths) == 1:
+        results = [process_file(paths[0], outs[0][0], outs[0][1], args)]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs or None) as pool:
+            futures = [pool.submit(process_file, p, of, oj, args) for p, (of, oj) in zip(paths, outs)]
+            results = []
+            for path, fut in zip(paths, futures):
+                try:
+                    results.append(fut.result())
+                except Exception as e:
+                    results.append(None)
+                    failed.append(path)
+                    print(f"[ERROR] {path}: {e}", file=sys.stderr)
+
+    for path, (out_features, out_json), result in zip(paths, outs, results):
+        if result is None:
+            continue
+        n_rows, summaries = result
+        if len(paths) > 1:
+            print(f"== {path}")
+        print(f"[OK] Features saved -> {out_features}  (rows={n_rows})")
+
+        print("\n=== Summary (percentiles) ===")
+        for k, v in summaries.items():
+            print(f"{k}: ADL p50={v.get('ADL_p50'):.3f}  ADL p95={v.get('ADL_p95'):.3f}  "
+                  f"FALL p50={v.get('FALL_p50'):.3f}  thr≈{v.get('thr'):.3f}")
+
+        print(f"\n[OK] Fuzzy params saved -> {out_json}")
 
     # Console hints for scikit-fuzzy usage
     print("\n--- How to use these in scikit-fuzzy (pseudo) ---")
@@ -286,6 +419,8 @@ def main():
     print("tiltD = ctrl.Antecedent(np.linspace(0, 120, 241), 'tilt_delta')")
     print("# Then assign trimfs using the JSON: fuzz.trimf(universe, [a,b,c])")
     print("# Example: accel['low'] = fuzz.trimf(accel.universe, fuzzy_params['accel']['trimf']['low'])")
+    if failed:
+        sys.exit(f"[ERROR] {len(failed)} of {len(paths)} inputs failed: {', '.join(failed)}")
 
 
 if __name__ == "__main__":
@@ -9,90 +9,197 @@ Fuzzy fall scoring (refined):
 - Adds rules for slip-like events (high gyro, low/medium acc).
 - Covers the "medium & medium" case.
 - Keeps inputs clamped. Output in [0..1].
+- Mamdani inference (AND = min, clip implication, max aggregation, centroid),
+  evaluated in closed form: triangles are computed analytically at the input,
+  and the centroid integrates the clipped aggregate exactly between its kinks,
+  so no sampled universes or skfuzzy ControlSystem are needed.
+  fuzzy_fall_score is pure Python; fuzzy_fall_score_batch does arrays with numpy.
 
 You still need an application-level decision rule, e.g.:
   FALL if (avg of last 200 ms scores) >= 0.7 AND peak(acc) >= 1.6g in same window.
 """
 
 import numpy as np
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
 
-# --- Universes ---
-acc_range  = np.arange(0.0, 3.50 + 1e-9, 0.01)   # g
-gyro_range = np.arange(0.0, 600.0 + 1e-9, 1.0)   # deg/s
-fall_range = np.arange(0.0, 1.00 + 1e-9, 0.01)   # dimensionless
+# --- Universes (bounds only; inputs are clamped to them) ---
+ACC_MAX  = 3.50    # g
+GYRO_MAX = 600.0   # deg/s
 
-acc  = ctrl.Antecedent(acc_range,  'aceleracion')
-gyro = ctrl.Antecedent(gyro_range, 'giro')
-fall = ctrl.Consequent(fall_range, 'caida')
-
-# --- Memberships ---
+# --- Memberships (a, b, c) for triangular sets ---
 # Keep the original shapes but extend "high" to the universe end to avoid zero-membership gaps.
 # At the low end, extend "low" down to 0 to keep coverage.
-# If you prefer trapezoids at edges, use fuzz.trapmf.
 
 # Acceleration (g)
-acc['bajo']   = fuzz.trimf(acc.universe,  [0.0, 0.4, 0.9])
-acc['medio']  = fuzz.trimf(acc.universe,  [0.7, 1.0, 1.6])
-acc['alto']   = fuzz.trimf(acc.universe,  [1.2, 2.2, 3.50])  # extended to 3.50 (universe max)
+ACC_MF = {
+    'bajo':  (0.0, 0.4, 0.9),
+    'medio': (0.7, 1.0, 1.6),
+    'alto':  (1.2, 2.2, 3.50),   # extended to 3.50 (universe max)
+}
 
 # Gyro (deg/s)
-gyro['lento']  = fuzz.trimf(gyro.universe, [0,   40,  90])
-gyro['medio']  = fuzz.trimf(gyro.universe, [60, 160, 260])
-gyro['rapido'] = fuzz.trimf(gyro.universe, [180, 320, 600])   # extended to 600 (universe max)
+GYRO_MF = {
+    'lento':  (0,   40,  90),
+    'medio':  (60, 160, 260),
+    'rapido': (180, 320, 600),   # extended to 600 (universe max)
+}
 
 # Output fall score
-fall['bajo']  = fuzz.trimf(fall.universe, [0.0, 0.2, 0.5])
-fall['medio'] = fuzz.trimf(fall.universe, [0.3, 0.5, 0.7])
-fall['alto']  = fuzz.trimf(fall.universe, [0.6, 0.85, 1.0])
+FALL_MF = {
+    'bajo':  (0.0, 0.2, 0.5),
+    'medio': (0.3, 0.5, 0.7),
+    'alto':  (0.6, 0.85, 1.0),
+}
 
 # --- Rules ---
-rules = [
+# (acc term, gyro term) → fall term; every rule is an AND of both inputs.
+RULES = [
     # High-impact + fast rotation → very likely fall
-    ctrl.Rule(acc['alto']  & gyro['rapido'], fall['alto']),
+    ('alto',  'rapido', 'alto'),
 
     # High-impact + medium rotation → likely
-    ctrl.Rule(acc['alto']  & gyro['medio'],  fall['medio']),
+    ('alto',  'medio',  'medio'),
 
     # Medium impact + fast rotation → possible fall (slip or awkward landing)
-    ctrl.Rule(acc['medio'] & gyro['rapido'], fall['medio']),
+    ('medio', 'rapido', 'medio'),
 
     # Slip-like: low/medium impact but very fast rotation should not be 'bajo'
-    ctrl.Rule(acc['bajo']  & gyro['rapido'], fall['medio']),
+    ('bajo',  'rapido', 'medio'),
 
     # Ambiguous: medium & medium → medium
-    ctrl.Rule(acc['medio'] & gyro['medio'],  fall['medio']),
+    ('medio', 'medio',  'medio'),
 
     # Low gyro and medium acc: often a brisk ADL; keep it low unless impact grows
-    ctrl.Rule(gyro['lento'] & acc['medio'],  fall['bajo']),
+    ('medio', 'lento',  'bajo'),
 
     # Low acc globally nudges to 'bajo' unless rotation says otherwise
-    ctrl.Rule(acc['bajo']  & gyro['lento'],  fall['bajo']),
+    ('bajo',  'lento',  'bajo'),
 
     # High acc but low rotation (e.g., bump without fall) → medium rather than high
-    ctrl.Rule(acc['alto']  & gyro['lento'],  fall['medio']),
+    ('alto',  'lento',  'medio'),
 ]
 
-system = ctrl.ControlSystem(rules)
+def trimf_point(x: float, a: float, b: float, c: float) -> float:
+    """Closed-form triangular membership of a single value (requires a < b < c)."""
+    return max(0.0, min((x - a) / (b - a), (c - x) / (c - b)))
+
+def _trimf(x: np.ndarray, a: float, b: float, c: float) -> np.ndarray:
+    """Closed-form triangular membership over an array (requires a < b < c)."""
+    return np.maximum(0.0, np.minimum((x - a) / (b - a), (c - x) / (c - b)))
+
+# --- Output aggregate breakpoints ---
+# The clip-and-max aggregate is piecewise linear on [0, 1]. Its kinks are the triangle
+# vertices, the points where two output triangles cross (both fixed), and the points where
+# a triangle meets one of the rule strengths (clip level, or another term's flat top).
+_FALL_TERMS = list(FALL_MF)
+_FALL_ABC   = [FALL_MF[name] for name in _FALL_TERMS]
+
+def _fixed_breaks():
+    """Universe ends, triangle vertices and pairwise crossings of the output triangles."""
+    xs = {0.0, 1.0}
+    pieces = []   # (slope, intercept, x0, x1) of every rising/falling edge
+    for a, b, c in _FALL_ABC:
+        xs.update((a, b, c))
+        pieces.append([(1.0 / (b - a), -a / (b - a), a, b), (-1.0 / (c - b), c / (c - b), b, c)])
+    for i in range(len(pieces)):
+        for j in range(i + 1, len(pieces)):
+            for m1, k1, lo1, hi1 in pieces[i]:
+                for m2, k2, lo2, hi2 in pieces[j]:
+                    if m1 != m2:
+                        x = (k2 - k1) / (m1 - m2)
+                        if max(lo1, lo2) <= x <= min(hi1, hi2):
+                            xs.add(x)
+    return sorted(x for x in xs if 0.0 <= x <= 1.0)
+
+_FALL_BREAKS    = _fixed_breaks()
+_FALL_BREAKS_NP = np.array(_FALL_BREAKS)
+_FALL_A_NP, _FALL_B_NP, _FALL_C_NP = np.array(_FALL_ABC).T   # (3,) each
 
 def fuzzy_fall_score(acc_mag_g: float, gyro_mag_dps: float) -> float:
     """
     Compute fuzzy fall score in [0..1].
     Inputs are clamped to the universe to avoid out-of-range artifacts.
+    Returns 0.0 when no rule fires.
     """
-    sim = ctrl.ControlSystemSimulation(system)
-    # Clamp to universes
-    sim.input['aceleracion'] = max(0.0, min(acc_mag_g, 3.50))
-    sim.input['giro']        = max(0.0, min(gyro_mag_dps, 600.0))
-    try:
-        sim.compute()
-        return float(sim.output['caida'])
-    except Exception as e:
-        # If something goes south, return safe low score
-        print(f"[FUZZY ERROR] acc={acc_mag_g:.3f}g gyro={gyro_mag_dps:.1f}dps -> {e}")
+    a = max(0.0, min(acc_mag_g, ACC_MAX))
+    g = max(0.0, min(gyro_mag_dps, GYRO_MAX))
+    mu_acc  = {name: trimf_point(a, *abc) for name, abc in ACC_MF.items()}
+    mu_gyro = {name: trimf_point(g, *abc) for name, abc in GYRO_MF.items()}
+
+    strength = dict.fromkeys(_FALL_TERMS, 0.0)
+    for a_term, g_term, out in RULES:
+        w = min(mu_acc[a_term], mu_gyro[g_term])
+        if w > strength[out]:
+            strength[out] = w
+    levels = [strength[name] for name in _FALL_TERMS]
+    if not any(levels):
         return 0.0
 
+    # Kinks that depend on the strengths: where each triangle reaches each level
+    xs = list(_FALL_BREAKS)
+    for lvl in levels:
+        if 0.0 < lvl < 1.0:
+            for ta, tb, tc in _FALL_ABC:
+                xs.append(ta + lvl * (tb - ta)); xs.append(tc - lvl * (tc - tb))
+    xs.sort()
+    (ba, bb, bc), (ma, mb, mc), (aa, ab, ac) = _FALL_ABC
+    s_bajo, s_medio, s_alto = levels
+
+    # Clip-and-max aggregate is linear between consecutive xs: exact trapezoid centroid
+    num = den = 0.0
+    x1 = y1 = None
+    for x2 in xs:
+        y2 = max(min(s_bajo, trimf_point(x2, ba, bb, bc)),
+                 min(s_medio, trimf_point(x2, ma, mb, mc)),
+                 min(s_alto, trimf_point(x2, aa, ab, ac)))
+        if x1 is not None:
+            dx = x2 - x1
+            area = 0.5 * dx * (y1 + y2)
+            num += x1 * area + dx * dx * (y1 + 2.0 * y2) / 6.0
+            den += area
+        x1, y1 = x2, y2
+    return num / den if den > 0.0 else 0.0
+
+def fuzzy_fall_score_batch(acc_mag_g, gyro_mag_dps) -> np.ndarray:
+    """
+    Vectorized fuzzy_fall_score for arrays of inputs (same inference, numpy).
+    Inputs are clamped to the universes; samples where no rule fires score 0.0.
+    """
+    a = np.clip(np.asarray(acc_mag_g, dtype=np.float64), 0.0, ACC_MAX).ravel()
+    g = np.clip(np.asarray(gyro_mag_dps, dtype=np.float64), 0.0, GYRO_MAX).ravel()
+
+    mu_acc  = {name: _trimf(a, *abc) for name, abc in ACC_MF.items()}
+    mu_gyro = {name: _trimf(g, *abc) for name, abc in GYRO_MF.items()}
+
+    strength = np.zeros((a.size, len(_FALL_TERMS)))
+    for a_term, g_term, out in RULES:
+        k = _FALL_TERMS.index(out)
+        np.maximum(strength[:, k], np.minimum(mu_acc[a_term], mu_gyro[g_term]), out=strength[:, k])
+
+    # Breakpoints per sample: fixed kinks + every triangle at every level, sorted: (n, K).
+    # Levels of 0 or 1 land on vertices, which are already kinks, so the shape stays fixed.
+    lvl = strength[:, :, None]                                         # (n, 3, 1)
+    rise = _FALL_A_NP + lvl * (_FALL_B_NP - _FALL_A_NP)                # (n, 3, 3)
+    fall = _FALL_C_NP - lvl * (_FALL_C_NP - _FALL_B_NP)
+    xs = np.concatenate((np.broadcast_to(_FALL_BREAKS_NP, (a.size, _FALL_BREAKS_NP.size)),
+                         rise.reshape(a.size, -1), fall.reshape(a.size, -1)), axis=1)
+    xs.sort(axis=1)
+
+    # Clip each output triangle by its strength and aggregate at the breakpoints: (n, K)
+    mf = np.maximum(0.0, np.minimum((xs[:, None, :] - _FALL_A_NP[:, None]) / (_FALL_B_NP - _FALL_A_NP)[:, None],
+                                    (_FALL_C_NP[:, None] - xs[:, None, :]) / (_FALL_C_NP - _FALL_B_NP)[:, None]))
+    agg = np.minimum(lvl, mf).max(axis=1)
+
+    # Centroid of the piecewise-linear aggregate (trapezoid segments, exact)
+    dx = np.diff(xs, axis=1)
+    x0 = xs[:, :-1]; y1 = agg[:, :-1]; y2 = agg[:, 1:]
+    area = 0.5 * dx * (y1 + y2)
+    moment = x0 * area + dx * dx * (y1 + 2.0 * y2) / 6.0
+    den = area.sum(axis=1)
+    num = moment.sum(axis=1)
+    out = np.zeros_like(den)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
 # Optional helper: threshold with hysteresis over a short window (pseudo)
 # Keep your real-time layer separate from fuzzy itself.
 def decision_from_scores(scores, hi=0.7, lo=0.5):
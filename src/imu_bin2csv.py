@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Converts a binary log from imu_logger_labeled_txt.py (--format bin) into the
+same CSV-like .txt the logger writes in its default mode, so the analysis
+scripts can read it unchanged.
+
+The file starts with one JSON line (record layout, columns, label and change names)
+followed by fixed-size little-endian records. Sensor values are stored as float32,
+so the last printed digit may differ from a log written directly as text.
+Logs written with --compress gz / zstd (.gz / .zst) are decompressed on the fly; a .gz
+cut short by a power loss or kill is converted up to the last record that can be decoded.
+
+Run:
+  python3 src/imu_bin2csv.py --in data/datos_imu.bin --out data/datos_imu.txt
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import struct
+
+try:
+    import zstandard  # optional: .zst input
+except ImportError:
+    zstandard = None
+
+# Same layout as imu_logger_labeled_txt.ROW_FMT
+ROW_FMT = "%.6f,%.6f,%.6f,%.6f,%.2f,%.2f,%.2f,%.6f,%.2f,%s,%d,%s\n"
+CHUNK_RECORDS = 4096
+
+def read_header(f):
+    """Parse the leading JSON line and return (meta, record struct)."""
+    meta = json.loads(f.readline())
+    if meta.get("format") != "imu-bin":
+        raise ValueError("Not an imu-bin log (missing JSON header line).")
+    return meta, struct.Struct(meta["record"])
+
+def open_log(path):
+    """Binary reader for path, decompressing .gz / .zst by extension."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise SystemExit("Reading .zst logs needs the 'zstandard' package (pip install zstandard).")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return open(path, "rb")
+
+def convert(in_path, out_path):
+    """
+    Write in_path's records as text rows to out_path. Returns (record count, truncated),
+    where truncated means a .gz input ended without its trailer (capture killed mid-write).
+    """
+    n = 0
+    truncated = False
+    with open_log(in_path) as fin, open(out_path, "w", encoding="ascii", newline="\n") as fout:
+        meta, rec = read_header(fin)
+        labels = meta["labels"]; changes = meta["changes"]
+        fout.write(",".join(meta["columns"]) + "\n")
+        tail = b""
+        while True:
+            # read1: one decompressor step per call, so a missing gzip trailer only
+            # costs the bytes that could not be decoded, not a whole chunk
+            try:
+                chunk = fin.read1(rec.size * CHUNK_RECORDS)
+            except EOFError:
+                truncated = True
+                break
+            if not chunk:
+                break
+            # Decompressing readers may return short reads; carry partial records over
+            chunk = tail + chunk
+            whole = len(chunk) - len(chunk) % rec.size
+            fout.writelines(
+                ROW_FMT % (*vals[:9], labels[vals[9]], vals[10], changes[vals[11]])
+                for vals in rec.iter_unpack(chunk[:whole])
+            )
+            n += whole // rec.size
+            tail = chunk[whole:]   # a truncated final record is dropped
+    return n, truncated
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="infile", required=True, help="Binary log from the logger (--format bin)")
+    ap.add_argument("--out", dest="outfile", default=None, help="Output .txt (default: input with .txt)")
+    args = ap.parse_args()
+
+    base = args.infile
+    for ext in (".gz", ".zst"):
+        if base.endswith(ext):
+            base = base[:-len(ext)]
+    out_path = args.outfile or os.path.splitext(base)[0] + ".txt"
+    # A bin log saved under a .txt name would otherwise be truncated by its own conversion
+    if os.path.abspath(out_path) == os.path.abspath(args.infile) or (
+            os.path.exists(out_path) and os.path.samefile(out_path, args.infile)):
+        ap.error(f"output {out_path} is the input file; pass a different --out")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    n, truncated = convert(args.infile, out_path)
+    print(f"[OK] {n} records → {out_path}")
+    if truncated:
+        print("[WARN] Input ended before the gzip trailer; converted the records recovered up to that point.")
+
+if __name__ == "__main__":
+    main()
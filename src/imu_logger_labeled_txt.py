@@ -8,78 +8,286 @@ Keyboard labels:
   - '1' -> FALL
   - 'SPACE' -> NONE
 Retro-labeling buffer lets you reassign the last N samples on FALL to compensate human delay.
+--format bin writes fixed-size binary records instead of text (convert with imu_bin2csv.py).
 
 Run:
   python3 -u src/imu_logger_labeled_txt.py --outfile data/datos_imu.txt --hz 50 --pre 0.5 --retro-mode fall_only
+  python3 -u src/imu_logger_labeled_txt.py --outfile data/datos_imu.bin --format bin
+  python3 -u src/imu_logger_labeled_txt.py --outfile data/datos_imu.bin --format bin --compress gz --rotate-mb 64
 """
 
 import time
 import sys
-import math
 import argparse
-import select
+import json
+import struct
 import termios
 import tty
 import os
-from collections import deque
-from smbus2 import SMBus
+import queue
+import signal
+import threading
+import gzip
+from array import array
+from mpu6050 import MPU6050
 
-# ---------- Non-blocking keyboard helpers (Linux TTY) ----------
-def kbhit():
-    try:
-        return select.select([sys.stdin], [], [], 0)[0] != []
-    except Exception:
-        return False
+try:
+    import zstandard  # optional: --compress zstd
+except ImportError:
+    zstandard = None
 
-def getch_nonblock():
-    return sys.stdin.read(1) if kbhit() else None
+# ---------- Non-blocking keyboard helpers (Linux TTY) ----------
+KEY_LABELS = {ord("0"): "ADL", ord("1"): "FALL", ord(" "): "NONE"}
 
 def setup_stdin_raw():
+    """cbreak mode on the TTY, plus a separate non-blocking fd for drain_keys()."""
     if not sys.stdin.isatty():
-        return None, None
+        return None, None, None
     fd = sys.stdin.fileno()
     old = termios.tcgetattr(fd)
     tty.setcbreak(fd)
-    return fd, old
+    # Own open file description: O_NONBLOCK here does not leak onto stdout (same terminal)
+    key_fd = os.open(os.ttyname(fd), os.O_RDONLY | os.O_NONBLOCK)
+    return fd, old, key_fd
 
-def restore_stdin(fd, old):
-    if fd and old:
+def restore_stdin(fd, old, key_fd):
+    if key_fd is not None:
+        os.close(key_fd)
+    if fd is not None and old:
         termios.tcsetattr(fd, termios.TCSADRAIN, old)
 
-# ---------- IMU ----------
-MPU_ADDR = 0x68
-ACC_SENS = 16384.0   # LSB/g (±2 g)
-GYRO_SENS = 131.0    # LSB/(°/s) (±250 dps)
+def drain_keys(key_fd):
+    """Everything typed since the last call, in one read (b'' when idle or without a TTY)."""
+    if key_fd is None:
+        return b""
+    try:
+        return os.read(key_fd, 64)
+    except BlockingIOError:
+        return b""
+
+def last_label_key(keys):
+    """Label of the last meaningful key in keys, or None."""
+    for ch in reversed(keys):
+        label = KEY_LABELS.get(ch)
+        if label is not None:
+            return label
+    return None
+
+# One output line: t, ax, ay, az, gx, gy, gz, a_mag, w_mag, label, event_id, label_change
+ROW_FMT = "%.6f,%.6f,%.6f,%.6f,%.2f,%.2f,%.2f,%.6f,%.2f,%s,%d,%s\n"
+
+# Binary record: t (f64), ax..gz (6x f32), a_mag, w_mag (f32), label id (u8), event_id (u32), change id (u8)
+REC = struct.Struct("<dffffffffBIB")
+LABELS = ["NONE", "ADL", "FALL"]
+LABEL_ID = {name: i for i, name in enumerate(LABELS)}
+CHANGES = [""] + [f"{a}->{b}" for a in LABELS for b in LABELS if a != b]
+CHANGE_ID = {name: i for i, name in enumerate(CHANGES)}
+HEADER_COLS = ["t","ax","ay","az","gx","gy","gz","a_mag","w_mag","label","event_id","label_change"]
+
+def encode_csv(row):
+    return (ROW_FMT % row).encode("ascii")
+
+def encode_bin(row):
+    return REC.pack(*row[:9], LABEL_ID[row[9]], row[10], CHANGE_ID[row[11]])
+
+def bin_header():
+    """One JSON line describing the records that follow (read by imu_bin2csv.py)."""
+    meta = {"format": "imu-bin", "version": 1, "record": REC.format, "columns": HEADER_COLS,
+            "labels": LABELS, "changes": CHANGES}
+    return json.dumps(meta) + "\n"
+
+FLUSH_BYTES = 4096   # pending output is written to the fd once it grows past this
+FADVISE_BYTES = 1 << 20   # written data is dropped from the page cache in 1 MiB steps
+
+def write_all(fd, data):
+    """os.write() until every byte is out (regular files rarely return short)."""
+    n = os.write(fd, data)
+    while n < len(data):
+        n += os.write(fd, data[n:])
+
+def drop_cache(fd, offset, length):
+    """Ask the kernel to evict a written range from the page cache (no-op where unsupported)."""
+    try:
+        os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+    except (AttributeError, OSError):
+        pass
+
+COMPRESS_EXT = {"none": "", "gz": ".gz", "zstd": ".zst"}
+
+def open_sink(out_fd, compress):
+    """
+    Byte sink over out_fd for the chosen --compress mode. Returns (write, close);
+    close() flushes the compressor trailer but leaves out_fd open for fsync.
+    Level 1 everywhere: the point is fewer bytes to the SD card at minimal CPU.
+    """
+    if compress == "none":
+        return (lambda data: write_all(out_fd, data)), (lambda: None)
+    raw = os.fdopen(out_fd, "wb", closefd=False)
+    if compress == "gz":
+        stream = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=1)
+    else:
+        stream = zstandard.ZstdCompressor(level=1).stream_writer(raw, closefd=False)
+    def close():
+        stream.close(); raw.close()
+    return stream.write, close
 
-def mpu_init(bus):
-    bus.write_byte_data(MPU_ADDR, 0x6B, 0x00)  # wake
-    time.sleep(0.05)
-    bus.write_byte_data(MPU_ADDR, 0x1C, 0x00)  # ±2 g
-    bus.write_byte_data(MPU_ADDR, 0x1B, 0x00)  # ±250 dps
+def part_path(out_path, index):
+    """data/datos_imu.txt.gz, 3 -> data/datos_imu_part003.txt.gz (--rotate-mb output names)."""
+    cext = next((e for e in COMPRESS_EXT.values() if e and out_path.endswith(e)), "")
+    root, ext = os.path.splitext(out_path[:len(out_path) - len(cext)])
+    return f"{root}_part{index:03d}{ext}{cext}"
 
-def read_raw(bus, reg):
-    hi = bus.read_byte_data(MPU_ADDR, reg)
-    lo = bus.read_byte_data(MPU_ADDR, reg + 1)
-    val = (hi << 8) | lo
-    return val - 65536 if val > 32767 else val
+def open_output(path, compress, header):
+    """
+    Create path, wrap it in the --compress sink and write the header.
+    Returns (fd, write, close); close() finishes the stream, fsyncs and closes the file.
+    """
+    out_fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    write, close_sink = open_sink(out_fd, compress)
+    write(header)
+    def close():
+        try:
+            close_sink()
+            os.fsync(out_fd)
+            drop_cache(out_fd, 0, 0)   # finished file: nothing of it needs to stay cached
+        finally:
+            os.close(out_fd)
+    return out_fd, write, close
 
-def read_mpu(bus):
-    ax = read_raw(bus, 0x3B) / ACC_SENS; ay = read_raw(bus, 0x3D) / ACC_SENS; az = read_raw(bus, 0x3F) / ACC_SENS
-    gx = read_raw(bus, 0x43) / GYRO_SENS; gy = read_raw(bus, 0x45) / GYRO_SENS; gz = read_raw(bus, 0x47) / GYRO_SENS
-    return (ax, ay, az), (gx, gy, gz)
+def writer_loop(q, output, encode, rotate_bytes=0, next_output=None, errors=None):
+    """
+    Writer thread: encode queued rows, write them in FLUSH_BYTES chunks, stop at None.
+    output is an open_output() triple and is closed on exit. With rotate_bytes > 0, a file
+    that reaches that size is closed and writing continues in next_output().
+    A write error (disk full, I/O error) ends the thread and is appended to errors.
+    """
+    out_fd, write, close = output
+    pending = bytearray()
+    dropped = 0
+    try:
+        try:
+            while True:
+                row = q.get()
+                if row is None:
+                    break
+                pending += encode(row)
+                if len(pending) > FLUSH_BYTES:
+                    write(pending); pending.clear()
+                    # File offset, not bytes handed over: compressed sinks write less than they take
+                    written = os.lseek(out_fd, 0, os.SEEK_CUR)
+                    if rotate_bytes and written >= rotate_bytes:
+                        close()
+                        out_fd, write, close = next_output()
+                        dropped = 0
+                    # Trail by one step so the dropped range has already been written back
+                    elif written - dropped >= 2 * FADVISE_BYTES:
+                        drop_cache(out_fd, dropped, FADVISE_BYTES)
+                        dropped += FADVISE_BYTES
+            write(pending)
+        finally:
+            close()
+    except Exception as e:
+        if errors is not None:
+            errors.append(e)
+        raise
+
+def console_loop(slot, ready):
+    """Console thread: print the latest status in slot[0] whenever ready is set; stop at None."""
+    while True:
+        ready.wait(); ready.clear()
+        status = slot[0]
+        if status is None:
+            break
+        frame, t, ax, ay, az, gx, gy, gz, a_mag, w_mag, label, event_id = status
+        print(
+            f"[{frame:06d}] t={t:7.3f}s | "
+            f"Acc(g): X={ax:+.3f} Y={ay:+.3f} Z={az:+.3f} | "
+            f"Gyr(°/s): X={gx:+.1f} Y={gy:+.1f} Z={gz:+.1f} | "
+            f"|a|={a_mag:.3f} | |ω|={w_mag:.1f} | "
+            f"label={label} ev={event_id}"
+        )
+
+class RetroRing:
+    """
+    Fixed-size ring of the last N samples for retro-labeling.
+    The 9 numeric columns of a slot sit in one flat array('d'); label, event_id and
+    label_change are kept as small integer ids in parallel arrays, so retro-labeling the
+    newest k samples is at most two C-level slice assignments.
+    """
+    NUM = 9   # t, ax, ay, az, gx, gy, gz, a_mag, w_mag
+
+    def __init__(self, n):
+        self.n = n
+        self.num = array("d", bytes(8 * self.NUM * n))
+        self.label = array("B", bytes(n))
+        self.event_id = array("I", bytes(4 * n))
+        self.change = array("B", bytes(n))
+        self.head = 0    # next slot to write
+        self.count = 0   # filled slots
 
-def write_row(f, row_dict):
-    """Safe writer: cast everything to str and flush to disk."""
-    f.write(",".join(str(v) for v in row_dict.values()) + "\n")
+    def row(self, k):
+        """Slot k as a ROW_FMT tuple."""
+        b = k * self.NUM
+        return (*self.num[b:b + self.NUM], LABELS[self.label[k]],
+                self.event_id[k], CHANGES[self.change[k]])
+
+    def push(self, t, acc, gyr, a_mag, w_mag, label, event_id, change):
+        """Store a sample; when full, return the evicted oldest row (else None)."""
+        h = self.head
+        evicted = self.row(h) if self.count == self.n else None
+        b = h * self.NUM
+        self.num[b:b + self.NUM] = array("d", (t, *acc, *gyr, a_mag, w_mag))
+        self.label[h] = LABEL_ID[label]; self.event_id[h] = event_id; self.change[h] = CHANGE_ID[change]
+        self.head = (h + 1) % self.n
+        if evicted is None:
+            self.count += 1
+        return evicted
+
+    def relabel(self, k, label, event_id, change):
+        """Assign label/event_id to the newest k samples and mark the newest with change."""
+        k = min(k, self.count)
+        if k == 0:
+            return
+        h = self.head
+        lid = LABEL_ID[label]
+        if h >= k:
+            self.label[h - k:h] = array("B", (lid,)) * k
+            self.event_id[h - k:h] = array("I", (event_id,)) * k
+        else:
+            tail = k - h   # slots wrapped to the end of the arrays
+            self.label[self.n - tail:] = array("B", (lid,)) * tail
+            self.event_id[self.n - tail:] = array("I", (event_id,)) * tail
+            self.label[:h] = array("B", (lid,)) * h
+            self.event_id[:h] = array("I", (event_id,)) * h
+        self.change[h - 1] = CHANGE_ID[change]
+
+    def drain(self):
+        """Yield the buffered rows oldest→newest and empty the ring."""
+        first = self.head - self.count
+        for i in range(first, self.head):
+            yield self.row(i % self.n)
+        self.count = 0
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--outfile", default="data/datos_imu.txt", help="Output .txt (CSV-like)")
+    ap.add_argument("--outfile", default=None,
+                    help="Output file (default: data/datos_imu.txt, or data/datos_imu.bin with --format bin)")
     ap.add_argument("--hz", type=int, default=50, help="Sampling rate (Hz)")
     ap.add_argument("--pre", type=float, default=0.5, help="Retro-label buffer seconds (0 disables)")
     ap.add_argument("--retro-mode", choices=["off", "fall_only", "all"], default="fall_only",
                     help="off=no retro; fall_only=only when switching to FALL; all=every label change")
+    ap.add_argument("--format", choices=["csv", "bin"], default="csv",
+                    help="csv=text rows; bin=fixed binary records after a JSON header line")
+    ap.add_argument("--compress", choices=["none", "gz", "zstd"], default="none",
+                    help="Compress the output stream at level 1 (adds .gz / .zst to --outfile)")
+    ap.add_argument("--rotate-mb", type=float, default=0,
+                    help="Start a new file (NAME_partNNN.ext, each with its own header) after about N MB "
+                         "written; 0 = one file")
     args = ap.parse_args()
+    if args.compress == "zstd" and zstandard is None:
+        ap.error("--compress zstd needs the 'zstandard' package (pip install zstandard)")
+    if args.rotate_mb < 0:
+        ap.error("--rotate-mb must be >= 0")
 
     # Unbuffered-ish stdout
     if hasattr(sys.stdout, "reconfigure"):
@@ -89,38 +297,82 @@ def main():
     period = 1.0 / fs
     pre_samples = max(0, int(round(args.pre * fs)))
 
+    # Sensor first: if it cannot be opened, no (empty, trailer-less) output file is left behind
+    mpu = MPU6050(1)
+
     # Prepare output
+    if args.outfile is None:
+        args.outfile = "data/datos_imu.bin" if args.format == "bin" else "data/datos_imu.txt"
     os.makedirs(os.path.dirname(args.outfile) or ".", exist_ok=True)
     out_path = os.path.abspath(args.outfile)
-    header_cols = ["t","ax","ay","az","gx","gy","gz","a_mag","w_mag","label","event_id","label_change"]
-    header = ",".join(header_cols) + "\n"
-    f = open(out_path, "w", buffering=1)
-    f.write(header)
+    ext = COMPRESS_EXT[args.compress]
+    if ext and not out_path.endswith(ext):
+        out_path += ext
+    header = ",".join(HEADER_COLS) + "\n"
+    encode = encode_bin if args.format == "bin" else encode_csv
+    file_header = (bin_header() if args.format == "bin" else header).encode("ascii")
+    # With rotation every part is a complete log, so a capture cut off by a power loss only
+    # loses the unfinished part's compressor trailer
+    rotate_bytes = int(args.rotate_mb * (1 << 20))
+    saved = []
+    def next_output():
+        path = part_path(out_path, len(saved)) if rotate_bytes else out_path
+        output = open_output(path, args.compress, file_header)
+        saved.append(path)
+        return output
+    output = next_output()
 
-    # IMU and keyboard
-    bus = SMBus(1); mpu_init(bus)
-    fd, old = setup_stdin_raw()
+    # Ticks come from an interval timer; SIGALRM stays blocked (in every thread started
+    # below) and is consumed with sigwait(), so a tick that fires mid-work is not lost.
+    # The no-op handler covers threads that predate the mask (e.g. native threads started at
+    # import): a tick the kernel hands to one of them is dropped instead of killing the process.
+    signal.signal(signal.SIGALRM, lambda *_: None)
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+
+    # Formatting and disk I/O run off the sampling path
+    rows = queue.SimpleQueue()
+    write_errors = []
+    writer = threading.Thread(target=writer_loop,
+                              args=(rows, output, encode, rotate_bytes, next_output, write_errors),
+                              name="imu-writer", daemon=True)
+    writer.start()
+
+    # Keyboard
+    fd, old, key_fd = setup_stdin_raw()
 
     # State
-    buffer = deque(maxlen=max(pre_samples, 1))
+    ring = RetroRing(max(pre_samples, 1))
     current_label = "NONE"; last_label = current_label
-    event_id = 0; frame = 0; t0 = time.time()
+    event_id = 0; frame = 0
 
-    print(f"Logging → {out_path}")
+    print(f"Logging → {saved[0]}" + (f" (new part every {args.rotate_mb:g} MB)" if rotate_bytes else ""))
     print("Keys: [0]=ADL, [1]=FALL, [SPACE]=NONE. Ctrl+C to exit.")
     print(f"(pre={args.pre:.2f}s → {pre_samples} samples, retro-mode={args.retro_mode})")
     print(header.strip())
 
+    # Console status at ~10 Hz (and on label changes), printed off the sampling path
+    ui_every = max(1, fs // 10)
+    status_slot = [None]; status_ready = threading.Event()
+    console = threading.Thread(target=console_loop, args=(status_slot, status_ready),
+                               name="imu-console", daemon=True)
+    console.start()
+
+    # Resolve everything fixed by the CLI once; the loop below only reads locals
+    buffered = pre_samples > 0
+    retro_labels = {"off": (), "fall_only": ("FALL",), "all": tuple(LABELS)}[args.retro_mode] if buffered else ()
+    perf_counter = time.perf_counter; sigwait = signal.sigwait; tick = (signal.SIGALRM,)
+    put_row = rows.put_nowait; push = ring.push; read_imu = mpu.read
+    writer_alive = writer.is_alive
+
     try:
-        next_t = time.perf_counter()
+        signal.setitimer(signal.ITIMER_REAL, period, period)
+        t0 = perf_counter()
         while True:
             # Handle keyboard
-            ch = getch_nonblock()
+            key_label = last_label_key(drain_keys(key_fd))
             label_change = ""
-            if ch is not None:
-                if ch == "0": current_label = "ADL"
-                elif ch == "1": current_label = "FALL"
-                elif ch == " ": current_label = "NONE"
+            if key_label is not None:
+                current_label = key_label
 
                 if current_label != last_label:
                     if current_label == "FALL":
@@ -129,76 +381,57 @@ def main():
                     print(f"[Label] {label_change} (event {event_id})", flush=True)
 
                     # Retro-label only if requested
-                    if pre_samples > 0:
-                        do_retro = (
-                            args.retro_mode == "all" or
-                            (args.retro_mode == "fall_only" and current_label == "FALL")
-                        )
-                        if do_retro:
-                            for i in range(1, min(pre_samples, len(buffer)) + 1):
-                                buffer[-i]["label"] = current_label
-                                buffer[-i]["event_id"] = event_id
-                                if i == 1:
-                                    buffer[-i]["label_change"] = label_change
+                    if current_label in retro_labels:
+                        ring.relabel(pre_samples, current_label, event_id, label_change)
                     last_label = current_label
 
             # Read IMU
-            (acc, gyr) = read_mpu(bus)
+            acc, gyr, a_mag, w_mag = read_imu()
             ax, ay, az = acc; gx, gy, gz = gyr
-            t = time.time() - t0
-
-            a_mag = math.sqrt(ax*ax + ay*ay + az*az)
-            w_mag = math.sqrt(gx*gx + gy*gy + gz*gz)
+            t = perf_counter() - t0
 
             frame += 1
-            row = {
-                "t": f"{t:.6f}",
-                "ax": f"{ax:.6f}",
-                "ay": f"{ay:.6f}",
-                "az": f"{az:.6f}",
-                "gx": f"{gx:.2f}",
-                "gy": f"{gy:.2f}",
-                "gz": f"{gz:.2f}",
-                "a_mag": f"{a_mag:.6f}",
-                "w_mag": f"{w_mag:.2f}",
-                "label": current_label,
-                "event_id": event_id,
-                "label_change": label_change
-            }
 
             # Buffered write to allow retro-labeling of the last N samples only
-            if pre_samples > 0:
-                buffer.append(row)
-                while len(buffer) > pre_samples:
-                    write_row(f, buffer.popleft())
+            if buffered:
+                evicted = push(t, acc, gyr, a_mag, w_mag, current_label, event_id, label_change)
+                if evicted is not None:
+                    put_row(evicted)
             else:
-                write_row(f, row)
-
-            # Console print
-            print(
-                f"[{frame:06d}] t={t:7.3f}s | "
-                f"Acc(g): X={ax:+.3f} Y={ay:+.3f} Z={az:+.3f} | "
-                f"Gyr(°/s): X={gx:+.1f} Y={gy:+.1f} Z={gz:+.1f} | "
-                f"|a|={a_mag:.3f} | |ω|={w_mag:.1f} | "
-                f"label={current_label} ev={event_id}"
-            )
-
-            # Timing
-            next_t += period
-            sleep_t = next_t - time.perf_counter()
-            time.sleep(sleep_t if sleep_t > 0 else 0)
+                put_row((t, ax, ay, az, gx, gy, gz, a_mag, w_mag,
+                         current_label, event_id, label_change))
+
+            # Console status (latest value wins if the terminal is slow)
+            if frame % ui_every == 0 or label_change:
+                # A dead writer (disk full, I/O error) would leave rows piling up in memory
+                if not writer_alive():
+                    status_slot[0] = None; status_ready.set(); console.join()
+                    break
+                status_slot[0] = (frame, t, ax, ay, az, gx, gy, gz, a_mag, w_mag, current_label, event_id)
+                status_ready.set()
+
+            # Wait for the next timer tick
+            sigwait(tick)
 
     except KeyboardInterrupt:
+        status_slot[0] = None; status_ready.set(); console.join()
         print("\nStopping. Flushing buffer...")
-        while buffer:
-            write_row(f, buffer.popleft())
+        for row in ring.drain():
+            rows.put_nowait(row)
     finally:
-        restore_stdin(fd, old)
-        try: bus.close()
-        except: pass
-        try: f.close()
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        restore_stdin(fd, old, key_fd)
+        try: mpu.close()
         except: pass
-        print(f"Saved at: {out_path}")
+        rows.put_nowait(None)
+        writer.join()
+        if write_errors:
+            print(f"\n[ERROR] Writing the log failed: {write_errors[0]}", file=sys.stderr)
+            print(f"[ERROR] Samples from that point on were not saved: {', '.join(saved)}", file=sys.stderr)
+        else:
+            print(f"Saved at: {saved[0]}" if len(saved) == 1 else f"Saved {len(saved)} parts: {saved[0]} … {saved[-1]}")
+    if write_errors:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
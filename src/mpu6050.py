@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Minimal MPU6050 driver shared by the IMU scripts (Linux i2c-dev, no smbus2).
+
+- Opens /dev/i2c-<bus_id> once and binds it to the sensor (I2C_SLAVE ioctl).
+- Wakes the sensor and sets ±2 g / ±250 dps.
+- One sample = set the register pointer to 0x3B, then one 14-byte burst read
+  into a preallocated buffer, decoded with a precompiled struct.
+
+Usage:
+  from mpu6050 import MPU6050
+  mpu = MPU6050()
+  (ax, ay, az), (gx, gy, gz), a_mag, w_mag = mpu.read()
+  mpu.close()
+"""
+
+import os
+import time
+import fcntl
+import struct
+from math import hypot
+
+MPU_ADDR = 0x68
+ACC_SENS = 16384.0   # LSB/g (±2 g)
+GYRO_SENS = 131.0    # LSB/(°/s) (±250 dps)
+INV_ACC = 1.0 / ACC_SENS
+INV_GYR = 1.0 / GYRO_SENS
+
+# Registers
+PWR_MGMT_1 = 0x6B
+ACCEL_CONFIG = 0x1C
+GYRO_CONFIG = 0x1B
+ACCEL_XOUT_H = 0x3B
+
+# 0x3B..0x48: accel XYZ, temperature (skipped), gyro XYZ — big-endian int16
+ACC_TEMP_GYR = struct.Struct(">3h2x3h")
+
+I2C_SLAVE = 0x0703    # ioctl from linux/i2c-dev.h: bind the fd to a slave address
+
+
+class MPU6050:
+    """MPU6050 on /dev/i2c-<bus_id>; every transfer after __init__ is a plain read/write."""
+
+    def __init__(self, bus_id=1, addr=MPU_ADDR):
+        self.fd = os.open(f"/dev/i2c-{bus_id}", os.O_RDWR)
+        try:
+            fcntl.ioctl(self.fd, I2C_SLAVE, addr)
+            self.write_reg(PWR_MGMT_1, 0x00)     # wake
+            time.sleep(0.05)
+            self.write_reg(ACCEL_CONFIG, 0x00)   # ±2 g
+            self.write_reg(GYRO_CONFIG, 0x00)    # ±250 dps
+        except BaseException:
+            os.close(self.fd)
+            raise
+        self._ptr = bytes((ACCEL_XOUT_H,))
+        self._buf = bytearray(14)
+        self._bufs = (self._buf,)
+
+    def write_reg(self, reg, val):
+        os.write(self.fd, bytes((reg, val)))
+
+    def read_raw(self):
+        """Six signed counts (ax, ay, az, gx, gy, gz) from one burst read."""
+        os.write(self.fd, self._ptr)        # register pointer, then auto-increment over 14 bytes
+        os.readv(self.fd, self._bufs)
+        return ACC_TEMP_GYR.unpack_from(self._buf)
+
+    def read(self):
+        """((ax, ay, az) in g, (gx, gy, gz) in °/s, |a| in g, |ω| in °/s)."""
+        rax, ray, raz, rgx, rgy, rgz = self.read_raw()
+        ax = rax * INV_ACC; ay = ray * INV_ACC; az = raz * INV_ACC
+        gx = rgx * INV_GYR; gy = rgy * INV_GYR; gz = rgz * INV_GYR
+        return (ax, ay, az), (gx, gy, gz), hypot(ax, ay, az), hypot(gx, gy, gz)
+
+    def read_into(self, out):
+        """Write ax, ay, az, gx, gy, gz, |a|, |ω| into out[0:8] (e.g. an array('d') or numpy row)."""
+        rax, ray, raz, rgx, rgy, rgz = self.read_raw()
+        ax = rax * INV_ACC; ay = ray * INV_ACC; az = raz * INV_ACC
+        gx = rgx * INV_GYR; gy = rgy * INV_GYR; gz = rgz * INV_GYR
+        out[0] = ax; out[1] = ay; out[2] = az
+        out[3] = gx; out[4] = gy; out[5] = gz
+        out[6] = hypot(ax, ay, az); out[7] = hypot(gx, gy, gz)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()